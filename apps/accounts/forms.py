@@ -11,6 +11,16 @@ from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
 
+AVATAR_MAX_SIZE_MB = 5
+
+
+def _avatar_too_large_error() -> ValidationError:
+    return ValidationError(
+        _('Avatar file size cannot exceed %(max_size_mb)dMB.'),
+        code='file_too_large',
+        params={'max_size_mb': AVATAR_MAX_SIZE_MB}
+    )
+
 
 class UserRegistrationForm(UserCreationForm):
     email = forms.EmailField(
@@ -140,13 +150,15 @@ class CustomPasswordResetForm(PasswordResetForm):
     
     def clean_email(self) -> str:
         """Validate that a user with this email exists."""
-        email = self.cleaned_data.get('email')
-        if not User.objects.filter(email=email.lower()).exists():
+        email = self.cleaned_data.get('email').lower()
+        user_id = User.objects.filter(email=email).values_list('pk', flat=True).first()
+        if user_id is None:
             raise ValidationError(
                 _('No user found with this email address.'),
                 code='email_not_found'
             )
-        return email.lower()
+        self.cleaned_data['user_id'] = user_id
+        return email
 
 
 class CustomSetPasswordForm(SetPasswordForm):
@@ -218,15 +230,21 @@ class UserProfileUpdateForm(forms.ModelForm):
         model = User
         fields = ('first_name', 'last_name', 'bio', 'avatar')
     
+    def __init__(self, *args, upload_too_large: bool = False, **kwargs):
+        self.upload_too_large = upload_too_large
+        super().__init__(*args, **kwargs)
+    
+    def clean(self):
+        if self.upload_too_large:
+            raise _avatar_too_large_error()
+        return super().clean()
+    
     def clean_avatar(self):
         avatar = self.cleaned_data.get('avatar')
         
         if avatar:
-            if avatar.size > 5 * 1024 * 1024:
-                raise ValidationError(
-                    _('Avatar file size cannot exceed 5MB.'),
-                    code='file_too_large'
-                )
+            if avatar.size > AVATAR_MAX_SIZE_MB * 1024 * 1024:
+                raise _avatar_too_large_error()
             
             if not avatar.content_type.startswith('image/'):
                 raise ValidationError(
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import UserManager as BaseUserManager
-from django.db.models import QuerySet
+from django.db.models import Avg, Count, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
 
 
 class UserManager(BaseUserManager):
@@ -32,4 +33,21 @@ class UserManager(BaseUserManager):
         return self.filter(email_verified=True, is_active=True)
 
     def active_users(self) -> QuerySet:
-        return self.filter(is_active=True)
\ No newline at end of file
+        return self.filter(is_active=True)
+
+    def with_activity_counts(self) -> QuerySet:
+        from apps.ratings.models import Comment, Rating
+
+        ratings = Rating.objects.filter(user=OuterRef('pk')).order_by().values('user')
+        comments = Comment.objects.filter(user=OuterRef('pk')).order_by().values('user')
+        return self.annotate(
+            ratings_count=Coalesce(
+                Subquery(ratings.annotate(count=Count('pk')).values('count')),
+                Value(0)
+            ),
+            avg_score=Subquery(ratings.annotate(avg=Avg('score')).values('avg')),
+            comments_count=Coalesce(
+                Subquery(comments.annotate(count=Count('pk')).values('count')),
+                Value(0)
+            )
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-14 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='emailverificationtoken',
+            name='accounts_em_token_5f2b37_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='passwordresettoken',
+            name='accounts_pa_token_affdf2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='emailverificationtoken',
+            index=models.Index(fields=['token', 'is_used'], name='accounts_em_token_629d48_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['token', 'is_used'], name='accounts_pa_token_861566_idx'),
+        ),
+    ]
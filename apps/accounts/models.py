@@ -105,7 +105,7 @@ class EmailVerificationToken(models.Model):
         verbose_name_plural = _('email verification tokens')
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['token']),
+            models.Index(fields=['token', 'is_used']),
             models.Index(fields=['expires_at']),
         ]
     
@@ -116,9 +116,9 @@ class EmailVerificationToken(models.Model):
         from django.utils import timezone
         return timezone.now() > self.expires_at
     
-    def mark_as_used(self) -> None:
-        self.is_used = True
-        self.save(update_fields=['is_used'])
+    @classmethod
+    def mark_used(cls, pk: int) -> bool:
+        return cls.objects.filter(pk=pk, is_used=False).update(is_used=True) > 0
 
 
 class PasswordResetToken(models.Model):
@@ -155,7 +155,7 @@ class PasswordResetToken(models.Model):
         verbose_name_plural = _('password reset tokens')
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['token']),
+            models.Index(fields=['token', 'is_used']),
             models.Index(fields=['expires_at']),
         ]
     
@@ -166,6 +166,6 @@ class PasswordResetToken(models.Model):
         from django.utils import timezone
         return timezone.now() > self.expires_at
     
-    def mark_as_used(self) -> None:
-        self.is_used = True
-        self.save(update_fields=['is_used'])
\ No newline at end of file
+    @classmethod
+    def mark_used(cls, pk: int) -> bool:
+        return cls.objects.filter(pk=pk, is_used=False).update(is_used=True) > 0
\ No newline at end of file
@@ -1,11 +1,25 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
+from contextlib import nullcontext
 from datetime import timedelta
-import secrets
+from functools import lru_cache
+from smtplib import (
+    SMTPAuthenticationError,
+    SMTPConnectError,
+    SMTPException,
+    SMTPServerDisconnected,
+)
+import base64
+import json
+import logging
+import os
 
+import redis
 from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import DatabaseError, IntegrityError, transaction
+from django.template.loader import get_template
 from django.utils import timezone
 from django.utils.html import strip_tags
 from django.conf import settings
@@ -13,106 +27,254 @@ from django.urls import reverse
 
 from .models import EmailVerificationToken, PasswordResetToken
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
+TOKEN_CREATE_ATTEMPTS = 3
+
+EMAIL_RETRY_BACKOFF = 5
+EMAIL_RETRY_BACKOFF_MAX = 2048
+EMAIL_MAX_RETRIES = 11
+
+EMAIL_FLUSH_LOCK_TIMEOUT = 60
+
+# Failures that affect the whole connection rather than a single message.
+# Every SMTPException is an OSError, so these must be matched before SMTPException.
+SMTP_CONNECTION_ERRORS = (SMTPServerDisconnected, SMTPConnectError, SMTPAuthenticationError)
+
+# Queued emails only carry a kind and a user id; the token and the message are
+# created when the batch is sent, so no live link sits in Redis or the broker.
+EMAIL_KINDS = {
+    'verification': {
+        'token_model': EmailVerificationToken,
+        'expiry_hours': 24,
+        'url_name': 'accounts:verify_email',
+        'url_context_key': 'verification_url',
+        'template_name': 'accounts/emails/verification_email.html',
+        'subject': 'Verify Your Email - VideoHub',
+    },
+    'password_reset': {
+        'token_model': PasswordResetToken,
+        'expiry_hours': 1,
+        'url_name': 'accounts:password_reset_confirm',
+        'url_context_key': 'reset_url',
+        'template_name': 'accounts/emails/password_reset_email.html',
+        'subject': 'Password Reset Request - VideoHub',
+    },
+}
+
+_email_queue: Optional[redis.Redis] = None
+
+
+def _get_email_queue() -> redis.Redis:
+    global _email_queue
+    if _email_queue is None:
+        _email_queue = redis.Redis.from_url(settings.EMAIL_QUEUE_URL)
+    return _email_queue
+
+
+def _enqueue_email(kind: str, user_id: int) -> None:
+    payload = {'kind': kind, 'user_id': user_id}
+    _get_email_queue().rpush(settings.EMAIL_QUEUE_KEY, json.dumps(payload))
+
+
+def _requeue_emails(payloads: List[Dict[str, Any]]) -> None:
+    # Append rather than prepend: flush_email_queue trims the head of the list
+    # after publishing, so only the tail may change while a flush is running.
+    _get_email_queue().rpush(
+        settings.EMAIL_QUEUE_KEY,
+        *(json.dumps(payload) for payload in payloads)
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_email_template(template_name: str):
+    # Resolve each email template once per worker instead of on every send.
+    return get_template(template_name)
+
+
+def _generate_token() -> str:
+    return base64.urlsafe_b64encode(os.urandom(32)).rstrip(b'=').decode()
+
+
+def _create_token(token_model, user_id: int, expires_at) -> str:
+    # A collision is astronomically unlikely, but handle it here rather than
+    # failing the whole task into a delayed retry.
+    for attempt in range(TOKEN_CREATE_ATTEMPTS):
+        token = _generate_token()
+        # In autocommit mode the INSERT stands alone. A savepoint is only needed
+        # to keep an enclosing transaction usable if the INSERT conflicts.
+        if transaction.get_connection().in_atomic_block:
+            savepoint = transaction.atomic()
+        else:
+            savepoint = nullcontext()
+        try:
+            with savepoint:
+                token_model.objects.create(
+                    user_id=user_id,
+                    token=token,
+                    expires_at=expires_at
+                )
+            return token
+        except IntegrityError:
+            if attempt == TOKEN_CREATE_ATTEMPTS - 1:
+                raise
+
+
+def _build_email(kind: str, user: Dict[str, Any], connection) -> EmailMultiAlternatives:
+    options = EMAIL_KINDS[kind]
+    expires_at = timezone.now() + timedelta(hours=options['expiry_hours'])
+    token = _create_token(options['token_model'], user['id'], expires_at)
+    
+    url = f"{settings.SITE_URL}{reverse(options['url_name'], kwargs={'token': token})}"
+    
+    context = {
+        'user': user,
+        options['url_context_key']: url,
+        'expiry_hours': options['expiry_hours']
+    }
+    
+    html_message = _get_email_template(options['template_name']).render(context)
+    
+    email = EmailMultiAlternatives(
+        subject=options['subject'],
+        body=strip_tags(html_message),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user['email']],
+        connection=connection
+    )
+    email.attach_alternative(html_message, 'text/html')
+    return email
+
+
+@shared_task(
+    autoretry_for=(redis.RedisError,),
+    retry_backoff=EMAIL_RETRY_BACKOFF,
+    retry_backoff_max=EMAIL_RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+    max_retries=EMAIL_MAX_RETRIES
+)
+def send_verification_email(user_id: int) -> str:
+    _enqueue_email('verification', user_id)
+    return f"Verification email queued for user {user_id}"
 
-@shared_task(bind=True, max_retries=3)
-def send_verification_email(self, user_id: int) -> Optional[str]:
+
+@shared_task(
+    autoretry_for=(redis.RedisError,),
+    retry_backoff=EMAIL_RETRY_BACKOFF,
+    retry_backoff_max=EMAIL_RETRY_BACKOFF_MAX,
+    retry_jitter=True,
+    max_retries=EMAIL_MAX_RETRIES
+)
+def send_password_reset_email(user_id: int) -> str:
+    _enqueue_email('password_reset', user_id)
+    return f"Password reset email queued for user {user_id}"
+
+
+def _send_email(kind: str, user: Dict[str, Any], connection) -> None:
+    email = _build_email(kind, user, connection)
     try:
-        user = User.objects.get(id=user_id)
-        
-        token = secrets.token_urlsafe(32)
-        
-        expires_at = timezone.now() + timedelta(hours=24)
-        EmailVerificationToken.objects.create(
-            user=user,
-            token=token,
-            expires_at=expires_at
-        )
-        
-        verification_url = f"{settings.SITE_URL}{reverse('accounts:verify_email', kwargs={'token': token})}"
-        
-        context = {
-            'user': user,
-            'verification_url': verification_url,
-            'expiry_hours': 24
-        }
-        
-        html_message = render_to_string('accounts/emails/verification_email.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject='Verify Your Email - VideoHub',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False
-        )
-        
-        return f"Verification email sent to {user.email}"
-        
-    except User.DoesNotExist:
-        return None
-    except Exception as exc:
-        raise self.retry(exc=exc, countdown=60)
+        email.send()
+    except SMTPServerDisconnected:
+        connection.close()
+        connection.open()
+        email.send()
 
 
-@shared_task(bind=True, max_retries=3)
-def send_password_reset_email(self, user_id: int) -> Optional[str]:
+@shared_task(bind=True, max_retries=EMAIL_MAX_RETRIES)
+def send_email_batch(self, payloads: List[Dict[str, Any]]) -> str:
+    processed = 0
+    sent = 0
+    
     try:
-        user = User.objects.get(id=user_id)
-        
-        token = secrets.token_urlsafe(32)
-        
-        expires_at = timezone.now() + timedelta(hours=1)
-        PasswordResetToken.objects.create(
-            user=user,
-            token=token,
-            expires_at=expires_at
-        )
-        
-        reset_url = f"{settings.SITE_URL}{reverse('accounts:password_reset_confirm', kwargs={'token': token})}"
+        users = User.objects.filter(
+            pk__in={payload['user_id'] for payload in payloads}
+        ).values('id', 'email', 'username')
+        users = {user['id']: user for user in users}
         
-        context = {
-            'user': user,
-            'reset_url': reset_url,
-            'expiry_hours': 1
-        }
+        with get_connection(fail_silently=False) as connection:
+            for payload in payloads:
+                user = users.get(payload['user_id'])
+                if user is not None:
+                    try:
+                        _send_email(payload['kind'], user, connection)
+                        sent += 1
+                    except SMTP_CONNECTION_ERRORS:
+                        raise
+                    except SMTPException:
+                        # Rejected recipient, refused data and the like: retrying
+                        # would only fail again and hold up the rest of the batch.
+                        logger.exception('Dropping undeliverable email to %s', user['email'])
+                processed += 1
+    except (*SMTP_CONNECTION_ERRORS, OSError, DatabaseError) as exc:
+        unsent = payloads[processed:]
         
-        html_message = render_to_string('accounts/emails/password_reset_email.html', context)
-        plain_message = strip_tags(html_message)
+        if self.request.retries >= self.max_retries:
+            logger.error(
+                'Giving up on the email batch after %d retries, requeueing %d emails',
+                self.request.retries,
+                len(unsent)
+            )
+            _requeue_emails(unsent)
+            raise
         
-        send_mail(
-            subject='Password Reset Request - VideoHub',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False
+        # Retry only the undelivered tail so nobody receives a duplicate.
+        raise self.retry(
+            args=(unsent,),
+            exc=exc,
+            countdown=get_exponential_backoff_interval(
+                factor=EMAIL_RETRY_BACKOFF,
+                retries=self.request.retries,
+                maximum=EMAIL_RETRY_BACKOFF_MAX,
+                full_jitter=True
+            )
         )
+    
+    # After a retry payloads is only the unsent tail, so report this run's sends.
+    return f"Sent {sent} emails"
+
+
+@shared_task(ignore_result=True)
+def flush_email_queue() -> None:
+    queue = _get_email_queue()
+    key = settings.EMAIL_QUEUE_KEY
+    
+    # Entries are only trimmed once the batch is on the broker, so a crash in
+    # between sends them twice rather than losing them. The lock keeps two
+    # overlapping flushes from publishing the same entries.
+    lock = queue.lock(f'{key}:flush', timeout=EMAIL_FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return
+    
+    try:
+        items = queue.lrange(key, 0, settings.EMAIL_BATCH_SIZE - 1)
+        if not items:
+            return
         
-        return f"Password reset email sent to {user.email}"
-        
-    except User.DoesNotExist:
-        return None
-    except Exception as exc:
-        raise self.retry(exc=exc, countdown=60)
+        send_email_batch.delay([json.loads(item) for item in items])
+        queue.ltrim(key, len(items), -1)
+    finally:
+        lock.release()
 
 
 @shared_task
 def cleanup_expired_tokens() -> str:
     now = timezone.now()
     
+    # Nothing references the token tables, so the deletion collector and
+    # delete signals can be bypassed with a single DELETE per table.
     expired_email_tokens = EmailVerificationToken.objects.filter(
         expires_at__lt=now
-    ).delete()
+    )
+    deleted_email_tokens = expired_email_tokens._raw_delete(expired_email_tokens.db)
     
     expired_password_tokens = PasswordResetToken.objects.filter(
         expires_at__lt=now
-    ).delete()
+    )
+    deleted_password_tokens = expired_password_tokens._raw_delete(expired_password_tokens.db)
     
     return (
-        f"Deleted {expired_email_tokens[0]} expired email verification tokens "
-        f"and {expired_password_tokens[0]} expired password reset tokens"
+        f"Deleted {deleted_email_tokens} expired email verification tokens "
+        f"and {deleted_password_tokens} expired password reset tokens"
     )
\ No newline at end of file
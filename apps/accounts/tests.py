@@ -1 +1,330 @@
-from django.test import TestCase
\ No newline at end of file
+from datetime import timedelta
+from smtplib import SMTPConnectError, SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest import mock
+import json
+
+from celery.exceptions import Retry
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from kombu.exceptions import OperationalError
+from django.utils import timezone
+
+from .models import EmailVerificationToken, PasswordResetToken
+from .views import UserProfileUpdateView
+from .tasks import (
+    EMAIL_MAX_RETRIES,
+    _create_token,
+    flush_email_queue,
+    send_email_batch,
+    send_verification_email,
+)
+
+User = get_user_model()
+
+
+class TokenMarkUsedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'old-password-123')
+
+    def test_mark_used_claims_token_only_once(self):
+        token = EmailVerificationToken.objects.create(
+            user=self.user,
+            token='verify-token',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertTrue(EmailVerificationToken.mark_used(token.pk))
+        self.assertFalse(EmailVerificationToken.mark_used(token.pk))
+
+        token.refresh_from_db()
+        self.assertTrue(token.is_used)
+
+
+class VerifyEmailTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'old-password-123')
+        self.token = EmailVerificationToken.objects.create(
+            user=self.user,
+            token='verify-token',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.url = reverse('accounts:verify_email', kwargs={'token': self.token.token})
+
+    def test_verifies_user_and_claims_token(self):
+        response = self.client.get(self.url)
+
+        self.assertRedirects(response, reverse('accounts:login'), fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.token.refresh_from_db()
+        self.assertTrue(self.user.email_verified)
+        self.assertTrue(self.token.is_used)
+
+    def test_does_not_verify_when_token_was_claimed_concurrently(self):
+        with mock.patch.object(EmailVerificationToken, 'mark_used', return_value=False):
+            response = self.client.get(self.url)
+
+        self.assertRedirects(response, reverse('accounts:login'), fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.email_verified)
+
+
+class PasswordResetConfirmTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'old-password-123')
+        self.token = PasswordResetToken.objects.create(
+            user=self.user,
+            token='reset-token',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.url = reverse('accounts:password_reset_confirm', kwargs={'token': self.token.token})
+        self.data = {
+            'new_password1': 'new-Password-456',
+            'new_password2': 'new-Password-456',
+        }
+
+    def test_resets_password_and_claims_token(self):
+        response = self.client.post(self.url, self.data)
+
+        self.assertRedirects(
+            response,
+            reverse('accounts:password_reset_complete'),
+            fetch_redirect_response=False
+        )
+        self.user.refresh_from_db()
+        self.token.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-Password-456'))
+        self.assertTrue(self.token.is_used)
+
+    def test_does_not_reset_when_token_was_claimed_concurrently(self):
+        with mock.patch.object(PasswordResetToken, 'mark_used', return_value=False):
+            response = self.client.post(self.url, self.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['validlink'])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('old-password-123'))
+
+
+
+@override_settings(EMAIL_QUEUE_KEY='emails:pending', EMAIL_BATCH_SIZE=2)
+class EmailQueueTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('apps.accounts.tasks._get_email_queue')
+        self.queue = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.queue.lock.return_value.acquire.return_value = True
+        self.items = [
+            json.dumps({'kind': 'verification', 'user_id': 1}).encode(),
+            json.dumps({'kind': 'password_reset', 'user_id': 2}).encode(),
+        ]
+
+    def test_enqueues_only_kind_and_user_id(self):
+        send_verification_email(7)
+
+        self.queue.rpush.assert_called_once_with(
+            'emails:pending',
+            json.dumps({'kind': 'verification', 'user_id': 7})
+        )
+
+    def test_flush_trims_entries_after_publishing(self):
+        self.queue.lrange.return_value = self.items
+
+        with mock.patch('apps.accounts.tasks.send_email_batch.delay') as delay:
+            flush_email_queue()
+
+        self.queue.lrange.assert_called_once_with('emails:pending', 0, 1)
+        delay.assert_called_once_with([
+            {'kind': 'verification', 'user_id': 1},
+            {'kind': 'password_reset', 'user_id': 2},
+        ])
+        self.queue.ltrim.assert_called_once_with('emails:pending', 2, -1)
+        self.queue.lock.return_value.release.assert_called_once_with()
+
+    def test_flush_keeps_entries_when_publish_fails(self):
+        self.queue.lrange.return_value = self.items
+
+        with mock.patch(
+            'apps.accounts.tasks.send_email_batch.delay',
+            side_effect=ConnectionError
+        ):
+            with self.assertRaises(ConnectionError):
+                flush_email_queue()
+
+        self.queue.ltrim.assert_not_called()
+        self.queue.lock.return_value.release.assert_called_once_with()
+
+    def test_flush_skips_while_another_flush_holds_the_lock(self):
+        self.queue.lock.return_value.acquire.return_value = False
+
+        flush_email_queue()
+
+        self.queue.lrange.assert_not_called()
+
+
+class CreateTokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'old-password-123')
+        self.expires_at = timezone.now() + timedelta(hours=1)
+        EmailVerificationToken.objects.create(
+            user=self.user,
+            token='taken',
+            expires_at=self.expires_at
+        )
+
+    def test_retries_with_a_fresh_token_on_collision(self):
+        with mock.patch('apps.accounts.tasks._generate_token', side_effect=['taken', 'fresh']):
+            token = _create_token(EmailVerificationToken, self.user.id, self.expires_at)
+
+        self.assertEqual(token, 'fresh')
+        self.assertTrue(EmailVerificationToken.objects.filter(token='fresh').exists())
+
+    def test_gives_up_after_repeated_collisions(self):
+        with mock.patch('apps.accounts.tasks._generate_token', return_value='taken'):
+            with self.assertRaises(IntegrityError):
+                _create_token(EmailVerificationToken, self.user.id, self.expires_at)
+
+        self.assertEqual(EmailVerificationToken.objects.count(), 1)
+
+
+@override_settings(EMAIL_QUEUE_KEY='emails:pending')
+class SendEmailBatchTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(name, f'{name}@example.com', 'password-123')
+            for name in ('alice', 'bob', 'carol')
+        ]
+        self.payloads = [{'kind': 'verification', 'user_id': user.id} for user in self.users]
+
+        patcher = mock.patch('apps.accounts.tasks.get_connection')
+        self.connection = patcher.start().return_value.__enter__.return_value
+        self.addCleanup(patcher.stop)
+        self.connection.send_messages.return_value = 1
+
+    def sent_to(self):
+        return [
+            call.args[0][0].to
+            for call in self.connection.send_messages.call_args_list
+        ]
+
+    def test_sends_every_email_over_one_connection(self):
+        result = send_email_batch(self.payloads)
+
+        self.assertEqual(result, 'Sent 3 emails')
+        self.assertEqual(
+            self.sent_to(),
+            [['alice@example.com'], ['bob@example.com'], ['carol@example.com']]
+        )
+        token = EmailVerificationToken.objects.get(user=self.users[0])
+        email = self.connection.send_messages.call_args_list[0].args[0][0]
+        self.assertIn(token.token, email.body)
+
+    def test_skips_users_that_no_longer_exist(self):
+        self.users[1].delete()
+
+        result = send_email_batch(self.payloads)
+
+        self.assertEqual(result, 'Sent 2 emails')
+        self.assertEqual(self.sent_to(), [['alice@example.com'], ['carol@example.com']])
+
+    def test_skips_undeliverable_messages(self):
+        self.connection.send_messages.side_effect = [1, SMTPRecipientsRefused({}), 1]
+
+        result = send_email_batch(self.payloads)
+
+        self.assertEqual(result, 'Sent 2 emails')
+        self.assertEqual(self.connection.send_messages.call_count, 3)
+
+    def test_reconnects_once_when_the_server_disconnects(self):
+        self.connection.send_messages.side_effect = [SMTPServerDisconnected(), 1, 1, 1]
+
+        result = send_email_batch(self.payloads)
+
+        self.assertEqual(result, 'Sent 3 emails')
+        self.connection.close.assert_called_once_with()
+        self.connection.open.assert_called_once_with()
+        self.assertEqual(EmailVerificationToken.objects.count(), 3)
+
+    def test_retries_only_the_unsent_tail(self):
+        self.connection.send_messages.side_effect = [1, SMTPConnectError(421, 'Busy')]
+
+        with mock.patch.object(send_email_batch, 'retry', side_effect=Retry) as retry:
+            with self.assertRaises(Retry):
+                send_email_batch(self.payloads)
+
+        self.assertEqual(retry.call_args.kwargs['args'], (self.payloads[1:],))
+
+    def test_requeues_the_unsent_tail_when_retries_run_out(self):
+        self.connection.send_messages.side_effect = [1, SMTPConnectError(421, 'Busy')]
+        send_email_batch.push_request(retries=EMAIL_MAX_RETRIES)
+        self.addCleanup(send_email_batch.pop_request)
+
+        with mock.patch('apps.accounts.tasks._get_email_queue') as get_queue:
+            with self.assertRaises(SMTPConnectError):
+                send_email_batch(self.payloads)
+
+        get_queue.return_value.rpush.assert_called_once_with(
+            'emails:pending',
+            *(json.dumps(payload) for payload in self.payloads[1:])
+        )
+
+
+class RegistrationTests(TestCase):
+    def setUp(self):
+        self.url = reverse('accounts:register')
+        self.data = {
+            'username': 'alice',
+            'email': 'alice@example.com',
+            'password1': 'new-Password-456',
+            'password2': 'new-Password-456',
+        }
+
+    def test_registers_user_when_the_broker_is_down(self):
+        with mock.patch(
+            'apps.accounts.views.send_verification_email.apply_async',
+            side_effect=OperationalError('Connection refused')
+        ):
+            with self.assertLogs('apps.accounts.views', 'ERROR'):
+                response = self.client.post(self.url, self.data)
+
+        self.assertRedirects(
+            response,
+            reverse('accounts:registration_complete'),
+            fetch_redirect_response=False
+        )
+        self.assertTrue(User.objects.filter(username='alice').exists())
+        levels = [message.level_tag for message in get_messages(response.wsgi_request)]
+        self.assertEqual(levels, ['warning'])
+
+
+@mock.patch.object(UserProfileUpdateView, 'max_request_size', 1024)
+class ProfileUpdateUploadLimitTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password-123')
+        self.client.force_login(self.user)
+        self.url = reverse('accounts:settings')
+
+    def test_rejects_oversized_avatar_and_keeps_later_fields(self):
+        avatar = SimpleUploadedFile('avatar.png', b'x' * 2048, content_type='image/png')
+
+        response = self.client.post(self.url, {'avatar': avatar, 'bio': 'Hello'})
+
+        self.assertEqual(response.status_code, 200)
+        form = response.context['form']
+        self.assertEqual(form.non_field_errors(), ['Avatar file size cannot exceed 5MB.'])
+        self.assertEqual(form.data['bio'], 'Hello')
+        self.assertNotIn('avatar', response.wsgi_request.FILES)
+
+    def test_large_body_without_avatar_is_not_an_avatar_error(self):
+        response = self.client.post(self.url, {'bio': 'Hello', 'padding': 'x' * 2048})
+
+        self.assertRedirects(
+            response,
+            reverse('accounts:profile', kwargs={'username': 'alice'}),
+            fetch_redirect_response=False
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.bio, 'Hello')
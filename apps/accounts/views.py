@@ -1,6 +1,7 @@
 from typing import Any, Dict
+import logging
 
-from django.contrib.auth import login, logout, get_user_model
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import (
@@ -10,26 +11,42 @@ from django.contrib.auth.views import (
 )
 from django.views import View
 from django.contrib import messages
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
-from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import CreateView, UpdateView, DetailView
+from kombu.exceptions import OperationalError
 
 from .forms import (
+    AVATAR_MAX_SIZE_MB,
     UserRegistrationForm,
     UserLoginForm,
     CustomPasswordResetForm,
     CustomSetPasswordForm,
     UserProfileUpdateForm
 )
+from apps.core.mixins import UploadSizeLimitMixin
 from .models import EmailVerificationToken, PasswordResetToken
 from .tasks import send_verification_email, send_password_reset_email
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
+def _queue_email(task, user_id: int) -> bool:
+    # Publishing fails fast (retry=False) so a broker outage cannot hang the
+    # request; report it instead of turning a committed change into a 500.
+    try:
+        task.apply_async((user_id,), retry=False)
+    except OperationalError:
+        logger.exception('Could not queue %s for user %s', task.name, user_id)
+        return False
+    return True
+
+
 class UserRegistrationView(CreateView):
     model = User
     form_class = UserRegistrationForm
@@ -44,12 +61,17 @@ class UserRegistrationView(CreateView):
     def form_valid(self, form: UserRegistrationForm) -> HttpResponse:
         user = form.save()
 
-        send_verification_email.delay(user.id)
-
-        messages.success(
-            self.request,
-            _('Registration successful! Please check your email to verify your account.')
-        )
+        if _queue_email(send_verification_email, user.id):
+            messages.success(
+                self.request,
+                _('Registration successful! Please check your email to verify your account.')
+            )
+        else:
+            messages.warning(
+                self.request,
+                _('Registration successful, but we could not send the verification email. '
+                  'Please request a new one from your profile.')
+            )
 
         return super().form_valid(form)
 
@@ -101,10 +123,14 @@ class CustomPasswordResetView(PasswordResetView):
     subject_template_name = 'accounts/emails/password_reset_subject.txt'
 
     def form_valid(self, form: CustomPasswordResetForm) -> HttpResponse:
-        email = form.cleaned_data['email']
-        user = User.objects.get(email=email)
+        user_id = form.cleaned_data['user_id']
 
-        send_password_reset_email.delay(user.id)
+        if not _queue_email(send_password_reset_email, user_id):
+            messages.error(
+                self.request,
+                _('We could not send the password reset email. Please try again later.')
+            )
+            return self.render_to_response(self.get_context_data(form=form))
 
         messages.success(
             self.request,
@@ -162,9 +188,11 @@ class CustomPasswordResetConfirmView(View):
             form = CustomSetPasswordForm(user=reset_token.user, data=request.POST)
 
             if form.is_valid():
-                form.save()
-
-                reset_token.mark_as_used()
+                with transaction.atomic():
+                    # Claim the token first so concurrent submissions cannot both reset
+                    if not PasswordResetToken.mark_used(reset_token.pk):
+                        raise PasswordResetToken.DoesNotExist
+                    form.save()
 
                 messages.success(
                     request,
@@ -194,21 +222,35 @@ class UserProfileView(DetailView):
     slug_field = 'username'
     slug_url_kwarg = 'username'
 
+    def get_queryset(self):
+        return User.objects.with_activity_counts()
+
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
         user = self.object
 
+        context['ratings_count'] = user.ratings_count
+        context['comments_count'] = user.comments_count
+        context['avg_score'] = user.avg_score
+
         return context
 
 
-class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
+class UserProfileUpdateView(UploadSizeLimitMixin, LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserProfileUpdateForm
     template_name = 'accounts/profile_update.html'
+    # The avatar plus 1MB for the remaining form fields
+    max_request_size = (AVATAR_MAX_SIZE_MB + 1) * 1024 * 1024
 
     def get_object(self, queryset=None) -> User:
         return self.request.user
 
+    def get_form_kwargs(self) -> Dict[str, Any]:
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_too_large'] = getattr(self.request, 'upload_too_large', False)
+        return kwargs
+
     def get_success_url(self) -> str:
         return reverse_lazy('accounts:profile', kwargs={'username': self.request.user.username})
 
@@ -241,11 +283,13 @@ def verify_email(request: HttpRequest, token: str) -> HttpResponse:
             )
             return redirect('accounts:resend_verification')
 
-        user = verification_token.user
-        user.email_verified = True
-        user.save(update_fields=['email_verified'])
+        with transaction.atomic():
+            if not EmailVerificationToken.mark_used(verification_token.pk):
+                raise EmailVerificationToken.DoesNotExist
 
-        verification_token.mark_as_used()
+            user = verification_token.user
+            user.email_verified = True
+            user.save(update_fields=['email_verified'])
 
         messages.success(
             request,
@@ -273,12 +317,16 @@ def resend_verification_email(request: HttpRequest) -> HttpResponse:
         )
         return redirect('accounts:profile', username=user.username)
 
-    send_verification_email.delay(user.id)
-
-    messages.success(
-        request,
-        _('A new verification email has been sent to your email address.')
-    )
+    if _queue_email(send_verification_email, user.id):
+        messages.success(
+            request,
+            _('A new verification email has been sent to your email address.')
+        )
+    else:
+        messages.error(
+            request,
+            _('We could not send the verification email. Please try again later.')
+        )
 
     return redirect('accounts:profile', username=user.username)
 
@@ -1,6 +1,9 @@
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .uploadhandlers import MaxRequestSizeUploadHandler
 
 
 class EmailVerificationRequiredMixin:
@@ -18,7 +21,25 @@ class EmailVerificationRequiredMixin:
 
 class AjaxResponseMixin:
     def is_ajax(self):
+        headers = self.request.headers
         return (
-            self.request.headers.get('X-Requested-With') == 'XMLHttpRequest' or
-            self.request.headers.get('HX-Request') == 'true'
-        )
\ No newline at end of file
+            headers.get('HX-Request') == 'true' or
+            headers.get('X-Requested-With') == 'XMLHttpRequest'
+        )
+
+
+class UploadSizeLimitMixin:
+    max_request_size = 5 * 1024 * 1024
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # CSRF is checked in dispatch() instead, because the middleware reads
+        # request.POST before the upload handler below could be installed.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers.insert(
+            0,
+            MaxRequestSizeUploadHandler(request, self.max_request_size)
+        )
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
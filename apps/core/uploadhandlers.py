@@ -0,0 +1,25 @@
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+
+class MaxRequestSizeUploadHandler(FileUploadHandler):
+    def __init__(self, request, max_size: int):
+        super().__init__(request)
+        self.max_size = max_size
+        self.too_large = False
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.too_large = content_length > self.max_size
+
+    def new_file(self, *args, **kwargs):
+        # Skip the file before any handler buffers it to memory or disk. Unlike
+        # StopUpload, this keeps parsing the form fields that follow it.
+        if self.too_large:
+            self.request.upload_too_large = True
+            raise SkipFile
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
@@ -1,21 +1,47 @@
 import os
+import secrets
 import uuid
-from typing import Optional
+from typing import Callable, Optional
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
 
 def generate_unique_slug(model_class, title: str, slug_field: str = 'slug') -> str:
     slug = slugify(title)
+    existing = set(
+        model_class.objects.filter(
+            Q(**{slug_field: slug}) | Q(**{f'{slug_field}__startswith': f'{slug}-'})
+        ).values_list(slug_field, flat=True)
+    )
+    
     unique_slug = slug
     counter = 1
     
-    while model_class.objects.filter(**{slug_field: unique_slug}).exists():
+    while unique_slug in existing:
         unique_slug = f"{slug}-{counter}"
         counter += 1
     
     return unique_slug
 
 
+def save_with_unique_slug(instance, save: Callable[[], None], title: str, slug_field: str = 'slug') -> None:
+    model_class = type(instance)
+    slug = generate_unique_slug(model_class, title, slug_field)
+    setattr(instance, slug_field, slug)
+
+    try:
+        with transaction.atomic():
+            save()
+    except IntegrityError:
+        # Only retry when another row claimed the slug between the lookup and
+        # the insert; any other constraint violation is the caller's problem.
+        if not model_class._default_manager.filter(**{slug_field: slug}).exists():
+            raise
+        setattr(instance, slug_field, f"{slug}-{secrets.token_hex(3)}")
+        save()
+
+
 def get_upload_path(instance, filename: str, folder: str = '') -> str:
     ext = filename.split('.')[-1]
     filename = f"{uuid.uuid4()}.{ext}"
@@ -2,30 +2,37 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 import os
 
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.webm'})
+
 
 def validate_file_size(file, max_size_mb: int = 5):
     max_size = max_size_mb * 1024 * 1024  # Convert MB to bytes
     if file.size > max_size:
         raise ValidationError(
-            _(f'File size cannot exceed {max_size_mb}MB.')
+            _('File size cannot exceed %(max_size_mb)dMB.'),
+            params={'max_size_mb': max_size_mb}
         )
 
 
-def validate_image_extension(file):
-    valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+def _validate_extension(file, allowed_extensions: frozenset, message):
     ext = os.path.splitext(file.name)[1].lower()
-    
-    if ext not in valid_extensions:
-        raise ValidationError(
-            _('Only image files are allowed (jpg, jpeg, png, gif, webp).')
-        )
+
+    if ext not in allowed_extensions:
+        raise ValidationError(message)
+
+
+def validate_image_extension(file):
+    _validate_extension(
+        file,
+        IMAGE_EXTENSIONS,
+        _('Only image files are allowed (jpg, jpeg, png, gif, webp).')
+    )
 
 
 def validate_video_extension(file):
-    valid_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-    ext = os.path.splitext(file.name)[1].lower()
-    
-    if ext not in valid_extensions:
-        raise ValidationError(
-            _('Only video files are allowed (mp4, avi, mov, mkv, webm).')
-        )
\ No newline at end of file
+    _validate_extension(
+        file,
+        VIDEO_EXTENSIONS,
+        _('Only video files are allowed (mp4, avi, mov, mkv, webm).')
+    )
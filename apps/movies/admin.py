@@ -88,7 +88,7 @@ class MovieAdmin(admin.ModelAdmin):
             'fields': ('poster', 'video_url', 'video_file')
         }),
         (_('Statistics'), {
-            'fields': ('views_count',),
+            'fields': ('views_count', 'avg_rating', 'ratings_count', 'comments_count'),
             'classes': ('collapse',)
         }),
         (_('Timestamps'), {
@@ -97,7 +97,14 @@ class MovieAdmin(admin.ModelAdmin):
         }),
     )
 
-    readonly_fields = ('created_at', 'updated_at', 'views_count')
+    readonly_fields = (
+        'created_at',
+        'updated_at',
+        'views_count',
+        'avg_rating',
+        'ratings_count',
+        'comments_count'
+    )
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -128,8 +135,3 @@ class MovieAdmin(admin.ModelAdmin):
         return '-'
 
     average_rating.short_description = _('Avg Rating')
-
-    def ratings_count(self, obj):
-        return obj.get_ratings_count()
-
-    ratings_count.short_description = _('Ratings')
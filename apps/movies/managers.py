@@ -1,14 +1,40 @@
+from django.contrib.postgres.search import SearchQuery, SearchVector
 from django.db import models
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIG = 'english'
+
+
+def movie_search_vector() -> SearchVector:
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('director', 'actors', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+LIST_FIELDS = (
+    'id',
+    'title',
+    'slug',
+    'poster',
+    'year',
+    'duration',
+    'views_count',
+    'avg_rating',
+    'category',
+)
 
 
 class MovieQuerySet(models.QuerySet):
+    def list_fields(self):
+        # Columns needed by catalog cards; skips descriptions and the search vector
+        return self.only(*LIST_FIELDS)
+
     def with_ratings(self):
-        return self.annotate(
-            avg_rating=Avg('ratings__score'),
-            ratings_count=Count('ratings', distinct=True),
-            comments_count=Count('comments', distinct=True)
-        )
+        # avg_rating, ratings_count and comments_count are stored on the row
+        return self
 
     def by_category(self, category_slug: str):
         return self.filter(category__slug=category_slug)
@@ -18,17 +44,48 @@ class MovieQuerySet(models.QuerySet):
 
     def search(self, query: str):
         return self.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(director__icontains=query) |
-            Q(actors__icontains=query)
+            Q(search_vector=SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)) |
+            Q(title__trigram_similar=query)
+        )
+
+    def update_search_vector(self) -> int:
+        return self.update(search_vector=movie_search_vector())
+
+    def refresh_rating_stats(self) -> int:
+        from apps.ratings.models import Rating
+
+        ratings = Rating.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        return self.update(
+            avg_rating=Coalesce(
+                Subquery(ratings.annotate(avg=Avg('score')).values('avg')),
+                Value(0.0),
+                output_field=FloatField()
+            ),
+            ratings_count=Coalesce(
+                Subquery(ratings.annotate(count=Count('pk')).values('count')),
+                Value(0)
+            )
+        )
+
+    def refresh_comments_count(self) -> int:
+        from apps.ratings.models import Comment
+
+        comments = Comment.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+        return self.update(
+            comments_count=Coalesce(
+                Subquery(comments.annotate(count=Count('pk')).values('count')),
+                Value(0)
+            )
         )
 
+    def adjust_comments_count(self, delta: int) -> int:
+        return self.update(comments_count=F('comments_count') + delta)
+
     def popular(self):
         return self.order_by('-views_count')
 
     def top_rated(self):
-        return self.with_ratings().order_by('-avg_rating')
+        return self.order_by('-avg_rating')
 
     def recent(self):
         return self.order_by('-created_at')
@@ -38,12 +95,18 @@ class MovieManager(models.Manager):
     def get_queryset(self):
         return MovieQuerySet(self.model, using=self._db)
 
+    def list_fields(self):
+        return self.get_queryset().list_fields()
+
     def with_ratings(self):
         return self.get_queryset().with_ratings()
 
     def by_category(self, category_slug: str):
         return self.get_queryset().by_category(category_slug)
 
+    def by_year(self, year: int):
+        return self.get_queryset().by_year(year)
+
     def search(self, query: str):
         return self.get_queryset().search(query)
 
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-14 18:01
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_rating_stats(apps, schema_editor):
+    Movie = apps.get_model('movies', 'Movie')
+    Rating = apps.get_model('ratings', 'Rating')
+    Comment = apps.get_model('ratings', 'Comment')
+
+    ratings = Rating.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+    comments = Comment.objects.filter(movie=OuterRef('pk')).order_by().values('movie')
+    Movie.objects.update(
+        avg_rating=Coalesce(
+            Subquery(ratings.annotate(avg=Avg('score')).values('avg')),
+            Value(0.0),
+            output_field=FloatField()
+        ),
+        ratings_count=Coalesce(
+            Subquery(ratings.annotate(count=Count('pk')).values('count')),
+            Value(0)
+        ),
+        comments_count=Coalesce(
+            Subquery(comments.annotate(count=Count('pk')).values('count')),
+            Value(0)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_movie_search_vector'),
+        ('ratings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='avg_rating',
+            field=models.FloatField(default=0, editable=False, help_text='Average rating score, kept in sync by rating signals', verbose_name='average rating'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of comments, kept in sync by comment signals', verbose_name='comments count'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='ratings_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of ratings, kept in sync by rating signals', verbose_name='ratings count'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-avg_rating'], name='movies_movi_avg_rat_6386ee_idx'),
+        ),
+        migrations.RunPython(populate_rating_stats, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,14 @@
+from functools import partial
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Avg
 
-from apps.core.utils import generate_unique_slug
+from apps.core.utils import save_with_unique_slug
+from .managers import MovieManager
 
 
 class Category(models.Model):
@@ -60,15 +64,18 @@ class Category(models.Model):
         return reverse('movies:category', kwargs={'slug': self.slug})
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = generate_unique_slug(Category, self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs), self.name)
 
     def get_movies_count(self) -> int:
         return self.movies.count()
 
 
 class Movie(models.Model):
+    STATS_FIELDS = ('avg_rating', 'ratings_count', 'comments_count')
+
     RATING_CHOICES = [
         ('G', 'G - General Audiences'),
         ('PG', 'PG - Parental Guidance Suggested'),
@@ -167,6 +174,27 @@ class Movie(models.Model):
         help_text=_('Number of views')
     )
 
+    avg_rating = models.FloatField(
+        _('average rating'),
+        default=0,
+        editable=False,
+        help_text=_('Average rating score, kept in sync by rating signals')
+    )
+
+    ratings_count = models.IntegerField(
+        _('ratings count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of ratings, kept in sync by rating signals')
+    )
+
+    comments_count = models.IntegerField(
+        _('comments count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of comments, kept in sync by comment signals')
+    )
+
     created_at = models.DateTimeField(
         _('created at'),
         auto_now_add=True
@@ -177,6 +205,14 @@ class Movie(models.Model):
         auto_now=True
     )
 
+    search_vector = SearchVectorField(
+        _('search vector'),
+        null=True,
+        editable=False
+    )
+
+    objects = MovieManager()
+
     class Meta:
         verbose_name = _('movie')
         verbose_name_plural = _('movies')
@@ -187,6 +223,9 @@ class Movie(models.Model):
             models.Index(fields=['year']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['-views_count']),
+            models.Index(fields=['-avg_rating']),
+            GinIndex(fields=['search_vector'], name='movies_movie_search_gin'),
+            GinIndex(OpClass('title', name='gin_trgm_ops'), name='movies_movie_title_trgm'),
         ]
 
     def __str__(self) -> str:
@@ -196,19 +235,33 @@ class Movie(models.Model):
         return reverse('movies:movie_detail', kwargs={'slug': self.slug})
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = generate_unique_slug(Movie, self.title)
-        super().save(*args, **kwargs)
+        # The rating and comment counters are maintained by ratings signals;
+        # writing back the values loaded on this instance would lose updates.
+        if (
+            not self._state.adding and
+            not kwargs.get('force_insert') and
+            kwargs.get('update_fields') is None
+        ):
+            skipped = self.get_deferred_fields().union(self.STATS_FIELDS)
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs), self.title)
 
     def get_average_rating(self) -> float:
-        result = self.ratings.aggregate(avg_rating=Avg('score'))
-        return round(result['avg_rating'], 1) if result['avg_rating'] else 0
+        return round(self.avg_rating, 1)
 
     def get_ratings_count(self) -> int:
-        return self.ratings.count()
+        return self.ratings_count
 
     def get_comments_count(self) -> int:
-        return self.comments.count()
+        return self.comments_count
 
     def increment_views(self) -> None:
         self.views_count += 1
@@ -1,16 +1,28 @@
-from django.db.models.signals import pre_delete
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
-import os
 
 from .models import Movie
+from .tasks import delete_media_files
+
+SEARCH_FIELDS = frozenset({'title', 'description', 'director', 'actors'})
+
+
+@receiver(post_save, sender=Movie)
+def movie_post_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+
+    Movie.objects.filter(pk=instance.pk).update_search_vector()
 
 
 @receiver(pre_delete, sender=Movie)
 def movie_pre_delete(sender, instance, **kwargs):
-    if instance.poster:
-        if os.path.isfile(instance.poster.path):
-            os.remove(instance.poster.path)
+    paths = [
+        field.path
+        for field in (instance.poster, instance.video_file)
+        if field
+    ]
 
-    if instance.video_file:
-        if os.path.isfile(instance.video_file.path):
-            os.remove(instance.video_file.path)
+    if paths:
+        transaction.on_commit(lambda: delete_media_files.delay(paths))
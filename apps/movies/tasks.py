@@ -0,0 +1,13 @@
+from typing import List
+import os
+
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def delete_media_files(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,2 +1,35 @@
+from unittest import mock
+
+from django.db import IntegrityError
 from django.test import TestCase
 
+from .models import Category
+
+
+class CategorySlugTests(TestCase):
+    def test_generates_next_free_slug(self):
+        Category.objects.create(name='Action', slug='action')
+        Category.objects.create(name='Action!', slug='action-1')
+
+        category = Category.objects.create(name='Action?')
+
+        self.assertEqual(category.slug, 'action-2')
+
+    def test_retries_with_random_suffix_when_slug_is_taken_concurrently(self):
+        Category.objects.create(name='Drama', slug='drama')
+
+        with mock.patch('apps.core.utils.generate_unique_slug', return_value='drama'):
+            category = Category.objects.create(name='Drama 2')
+
+        self.assertRegex(category.slug, r'^drama-[0-9a-f]{6}$')
+
+    def test_reraises_integrity_errors_unrelated_to_slug(self):
+        Category.objects.create(name='Comedy')
+
+        with mock.patch('apps.core.utils.secrets.token_hex') as token_hex:
+            with self.assertRaises(IntegrityError):
+                Category.objects.create(name='Comedy')
+
+        token_hex.assert_not_called()
+
+        self.assertEqual(Category.objects.count(), 1)
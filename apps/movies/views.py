@@ -1,7 +1,7 @@
 from typing import Any, Dict
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import QuerySet, Q
+from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
@@ -16,7 +16,7 @@ class MovieListView(ListView):
     paginate_by = 24
 
     def get_queryset(self) -> QuerySet:
-        queryset = Movie.objects.select_related('category')
+        queryset = Movie.objects.list_fields().select_related('category')
 
         category_slug = self.request.GET.get('category')
         if category_slug:
@@ -28,12 +28,7 @@ class MovieListView(ListView):
 
         search_query = self.request.GET.get('q')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(director__icontains=search_query) |
-                Q(actors__icontains=search_query)
-            )
+            queryset = queryset.search(search_query)
 
         sort_by = self.request.GET.get('sort', '-created_at')
         valid_sorts = [
@@ -119,7 +114,7 @@ class MovieDetailView(DetailView):
 
         context['comments'] = movie.comments.select_related('user').order_by('-created_at')[:10]
 
-        context['related_movies'] = Movie.objects.filter(
+        context['related_movies'] = Movie.objects.list_fields().filter(
             category=movie.category
         ).exclude(
             id=movie.id
@@ -136,7 +131,7 @@ class CategoryMoviesView(ListView):
 
     def get_queryset(self) -> QuerySet:
         self.category = get_object_or_404(Category, slug=self.kwargs['slug'])
-        return Movie.objects.filter(
+        return Movie.objects.list_fields().filter(
             category=self.category
         ).select_related('category')
 
@@ -152,12 +147,7 @@ def search_movies(request: HttpRequest) -> HttpResponse:
     movies = []
 
     if query:
-        movies = Movie.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(director__icontains=query) |
-            Q(actors__icontains=query)
-        ).select_related('category')[:20]
+        movies = Movie.objects.list_fields().search(query).select_related('category')[:20]
 
     context = {
         'movies': movies,
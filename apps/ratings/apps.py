@@ -5,3 +5,6 @@ class RatingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ratings'
     verbose_name = 'Ratings and Comments'
+
+    def ready(self):
+        import apps.ratings.signals
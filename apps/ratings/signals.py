@@ -0,0 +1,62 @@
+from weakref import WeakKeyDictionary
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.movies.models import Movie
+from .models import Comment, Rating
+
+# Movie stats awaiting a refresh once the current transaction commits, per connection
+_pending_refreshes = WeakKeyDictionary()
+
+
+def _refresh_pending(connection) -> None:
+    pending = _pending_refreshes.pop(connection, None)
+    if not pending:
+        return
+
+    for stats, movie_ids in pending.items():
+        movies = Movie.objects.using(connection.alias).filter(pk__in=movie_ids)
+        if stats == 'ratings':
+            movies.refresh_rating_stats()
+        else:
+            movies.refresh_comments_count()
+
+
+def _schedule_refresh(using: str, origin, movie_id: int, stats: str) -> None:
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(origin_model, Movie):
+        # The movie itself is going away; there is nothing left to update.
+        return
+
+    # Collector.delete() runs inside an atomic block, so the refresh lands after
+    # every row of the delete() call is gone and covers each movie only once.
+    # Every row registers the callback so a rolled back batch cannot strand the
+    # pending ids; the first callback to run takes them all.
+    connection = transaction.get_connection(using)
+    pending = _pending_refreshes.setdefault(connection, {})
+    pending.setdefault(stats, set()).add(movie_id)
+    transaction.on_commit(lambda: _refresh_pending(connection), using=using)
+
+
+@receiver(post_save, sender=Rating)
+def rating_post_save(sender, instance, **kwargs):
+    Movie.objects.filter(pk=instance.movie_id).refresh_rating_stats()
+
+
+@receiver(pre_delete, sender=Rating)
+def rating_pre_delete(sender, instance, origin, using, **kwargs):
+    _schedule_refresh(using, origin, instance.movie_id, 'ratings')
+
+
+@receiver(post_save, sender=Comment)
+def comment_post_save(sender, instance, created, **kwargs):
+    if created:
+        Movie.objects.filter(pk=instance.movie_id).adjust_comments_count(1)
+
+
+@receiver(pre_delete, sender=Comment)
+def comment_pre_delete(sender, instance, origin, using, **kwargs):
+    _schedule_refresh(using, origin, instance.movie_id, 'comments')
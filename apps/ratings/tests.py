@@ -1,2 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.movies.models import Category, Movie
+from .models import Comment, Rating
+
+User = get_user_model()
+
+
+class MovieStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password-123')
+        self.other_user = User.objects.create_user('bob', 'bob@example.com', 'password-123')
+        category = Category.objects.create(name='Drama')
+        self.movie = Movie.objects.create(
+            title='Heat',
+            description='Crime drama',
+            category=category,
+            year=1995,
+            duration=170,
+            poster='movies/posters/heat.jpg'
+        )
+
+    def test_ratings_and_comments_update_stats(self):
+        Rating.objects.create(user=self.user, movie=self.movie, score=8)
+        rating = Rating.objects.create(user=self.other_user, movie=self.movie, score=6)
+        Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.avg_rating, 7)
+        self.assertEqual(self.movie.ratings_count, 2)
+        self.assertEqual(self.movie.comments_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rating.delete()
+
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.avg_rating, 8)
+        self.assertEqual(self.movie.ratings_count, 1)
+
+    def test_full_save_does_not_overwrite_stats(self):
+        stale_movie = Movie.objects.get(pk=self.movie.pk)
+        Rating.objects.create(user=self.user, movie=self.movie, score=9)
+        Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+
+        stale_movie.title = "Heat (Director's Cut)"
+        stale_movie.save()
+
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.title, "Heat (Director's Cut)")
+        self.assertEqual(self.movie.avg_rating, 9)
+        self.assertEqual(self.movie.ratings_count, 1)
+        self.assertEqual(self.movie.comments_count, 1)
+
+    def test_deferred_save_writes_only_loaded_columns(self):
+        movie = Movie.objects.list_fields().get(pk=self.movie.pk)
+        movie.title = 'Heat 2'
+
+        with CaptureQueriesContext(connection) as queries:
+            movie.save()
+
+        selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(selects, [])
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.title, 'Heat 2')
+        self.assertEqual(self.movie.description, 'Crime drama')
+
+    def test_deleting_movie_skips_stats_refresh(self):
+        Rating.objects.create(user=self.user, movie=self.movie, score=8)
+        Rating.objects.create(user=self.other_user, movie=self.movie, score=6)
+        Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+
+        with mock.patch('apps.movies.signals.delete_media_files.delay'):
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.movie.delete()
+
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "movies_movie"')]
+        self.assertEqual(updates, [])
+
+    def test_bulk_delete_refreshes_each_movie_once(self):
+        Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+        Comment.objects.create(user=self.other_user, movie=self.movie, text='Meh')
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                Comment.objects.filter(movie=self.movie).delete()
+
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "movies_movie"')]
+        self.assertEqual(len(updates), 1)
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.comments_count, 0)
+
+    def test_reused_queryset_refreshes_on_every_delete(self):
+        comments = Comment.objects.filter(movie=self.movie)
+
+        for _ in range(2):
+            Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+            with self.captureOnCommitCallbacks(execute=True):
+                comments.delete()
+
+            self.movie.refresh_from_db()
+            self.assertEqual(self.movie.comments_count, 0)
+
+    def test_deleting_user_refreshes_stats(self):
+        Rating.objects.create(user=self.user, movie=self.movie, score=8)
+        Rating.objects.create(user=self.other_user, movie=self.movie, score=6)
+        Comment.objects.create(user=self.user, movie=self.movie, text='Great')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
 
+        self.movie.refresh_from_db()
+        self.assertEqual(self.movie.avg_rating, 6)
+        self.assertEqual(self.movie.ratings_count, 1)
+        self.assertEqual(self.movie.comments_count, 0)
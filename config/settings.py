@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'apps.accounts',
     'apps.core',
@@ -126,11 +127,28 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Keep idle broker and result backend connections open instead of reconnecting
+CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BROKER_TRANSPORT_OPTIONS = {'socket_keepalive': True}
+CELERY_REDIS_SOCKET_KEEPALIVE = True
+
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_WORKER_LOG_FORMAT = '[%(asctime)s: %(levelname)s/%(processName)s] %(message)s'
 CELERY_WORKER_TASK_LOG_FORMAT = '[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s'
 
+CELERY_BEAT_SCHEDULE = {
+    'flush-email-queue': {
+        'task': 'apps.accounts.tasks.flush_email_queue',
+        'schedule': 1.0,
+    },
+}
+
+# Outgoing emails are queued in Redis and sent in batches over one SMTP connection
+EMAIL_QUEUE_URL = config('EMAIL_QUEUE_URL', default=CELERY_BROKER_URL)
+EMAIL_QUEUE_KEY = 'emails:pending'
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=100, cast=int)
+
 if DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
     EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'